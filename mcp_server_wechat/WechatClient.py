@@ -35,6 +35,28 @@ class WeChatClient:
         """
         获取特定日期的微信聊天记录
 
+        参数同 get_chat_records_by_date
+        返回:
+        - 聊天记录的JSON字符串
+        """
+        records = self.get_chat_records_by_date(
+            friend=friend,
+            target_date=target_date,
+            folder_path=folder_path,
+            search_pages=search_pages,
+            wechat_path=wechat_path,
+            is_maximize=is_maximize,
+            close_wechat=close_wechat,
+            scroll_delay=scroll_delay
+        )
+        return json.dumps(records, ensure_ascii=False, indent=4)
+
+    def get_chat_records_by_date(self, friend: str, target_date: str, folder_path: str = None,
+                                 search_pages: int = 5, wechat_path: str = None, is_maximize: bool = False,
+                                 close_wechat: bool = True, scroll_delay: float = 0.01) -> List[dict]:
+        """
+        获取特定日期的微信聊天记录
+
         参数:
         - friend: 好友或群聊备注或昵称
         - target_date: 目标日期，格式为"YY/M/D"，如"25/3/22"
@@ -45,7 +67,7 @@ class WeChatClient:
         - close_wechat: 完成后是否关闭微信
         - scroll_delay: 翻页延迟时间(秒)
         返回:
-        - 聊天记录的JSON字符串
+        - 聊天记录列表，每条包含index、发送者、时间、消息
         """
         if folder_path is None:
             folder_path = self.default_folder_path
@@ -185,7 +207,7 @@ class WeChatClient:
         if not found_target_date:
             chat_history_window.close()
             self.logger.warning(f"未找到{target_date}的聊天记录，共翻页{search_count}次")
-            return json.dumps([], ensure_ascii=False, indent=4)
+            return []
 
         self.logger.info(f"开始收集{target_date}的聊天记录")
 
@@ -247,9 +269,8 @@ class WeChatClient:
                 "消息": message
             })
 
-        chat_history_json = json.dumps(formatted_messages, ensure_ascii=False, indent=4)
-
         if folder_path:
+            chat_history_json = json.dumps(formatted_messages, ensure_ascii=False, indent=4)
             safe_date = target_date.replace('/', '-') 
             json_path = os.path.abspath(os.path.join(folder_path, f'与{friend}的{safe_date}聊天记录.json'))
             os.makedirs(os.path.dirname(json_path), exist_ok=True)
@@ -265,7 +286,7 @@ class WeChatClient:
         else:
             self.logger.info(f"共获取到{len(formatted_messages)}条{target_date}的聊天记录")
 
-        return chat_history_json
+        return formatted_messages
 
     def send_message_to_friend(self, friend: str, message: str, search_pages: int = 0):
         """
@@ -1,4 +1,5 @@
 import json
+import re
 from typing import Any, Sequence, Dict, List, Optional
 
 from mcp.server import Server
@@ -9,6 +10,149 @@ from mcp.shared.exceptions import McpError
 
 from .WechatClient import WeChatClient
 
+OUTPUT_MODES = ("text", "compact", "jsonl")
+
+# 记录字段及可用的英文别名
+RECORD_FIELDS = ("index", "发送者", "时间", "消息")
+DEFAULT_FIELDS = ("发送者", "时间", "消息")
+FIELD_ALIASES = {"sender": "发送者", "time": "时间", "message": "消息"}
+
+
+def _parse_fields(fields) -> List[str]:
+    """解析字段投影参数，返回按记录字段顺序排列的字段列表"""
+    if not fields:
+        return list(DEFAULT_FIELDS)
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',')]
+
+    selected = set()
+    for field in fields:
+        if not field:
+            continue
+        field = FIELD_ALIASES.get(field, field)
+        if field not in RECORD_FIELDS:
+            raise ValueError(f"不支持的字段: {field}，可选: {', '.join(RECORD_FIELDS)}")
+        selected.add(field)
+    if not selected:
+        return list(DEFAULT_FIELDS)
+    return [field for field in RECORD_FIELDS if field in selected]
+
+
+def _parse_minutes(time_str: str) -> Optional[int]:
+    """从微信时间字符串(如"25/3/22 10:30"、"昨天 10:30")中提取当天的分钟数"""
+    match = re.search(r'(\d{1,2}):(\d{2})(?::\d{2})?$', time_str.strip())
+    if not match:
+        return None
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+def _format_delta(minutes: int) -> str:
+    """将分钟差格式化为相对时间，如+5m、+1h20m"""
+    if minutes < 60:
+        return f"+{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    return f"+{hours}h{minutes}m" if minutes else f"+{hours}h"
+
+
+def _parse_history_options(output_mode: Optional[str] = None, fields=None, max_messages=None):
+    """
+    校验聊天记录的输出参数
+
+    返回:
+    - (output_mode, fields, max_messages)
+    """
+    output_mode = output_mode or "text"
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(f"不支持的输出模式: {output_mode}，可选: {', '.join(OUTPUT_MODES)}")
+    fields = _parse_fields(fields)
+    if max_messages is not None:
+        if isinstance(max_messages, bool) or not isinstance(max_messages, int):
+            raise ValueError(f"max_messages 必须为整数: {max_messages!r}")
+        if max_messages < 0:
+            raise ValueError("max_messages 不能为负数")
+    return output_mode, fields, max_messages
+
+
+def format_chat_history(records: List[Dict[str, Any]], friend: str, target_date: str,
+                        output_mode: str = "text", fields=None, max_messages: Optional[int] = None,
+                        sender: Optional[str] = None) -> str:
+    """
+    将聊天记录格式化为工具返回的文本
+
+    参数:
+    - records: 聊天记录列表
+    - friend: 好友或群聊备注或昵称
+    - target_date: 目标日期
+    - output_mode: 输出模式，text(逐条标注)、compact(每条一行)或jsonl(首行为统计信息对象，其后每条一个JSON对象)
+    - fields: 需要输出的字段列表
+    - max_messages: 最多返回的消息条数，保留最近的消息
+    - sender: 只返回该发送者的消息
+    返回:
+    - 格式化后的文本
+    """
+    output_mode, fields, max_messages = _parse_history_options(output_mode, fields, max_messages)
+
+    total = len(records)
+    if sender:
+        records = [record for record in records if record['发送者'] == sender]
+    if max_messages is not None:
+        records = records[-max_messages:] if max_messages else []
+
+    if output_mode == "jsonl":
+        # 首行为统计信息对象，保证每行都是合法JSON
+        summary = {"total": total, "matched": len(records), "friend": friend, "date": target_date}
+        lines = [json.dumps(summary, ensure_ascii=False)]
+        lines.extend(
+            json.dumps({field: record[field] for field in fields}, ensure_ascii=False)
+            for record in records
+        )
+        return "\n".join(lines) + "\n"
+
+    header = f"获取到 {total} 条与 {friend} 在 {target_date} 的聊天记录"
+    if len(records) != total:
+        header += f"，筛选后 {len(records)} 条"
+    lines = [header, ""]
+
+    if output_mode == "compact":
+        show_index = "index" in fields
+        show_sender = "发送者" in fields
+        show_time = "时间" in fields
+        show_message = "消息" in fields
+        last_sender = None
+        last_minutes = None
+        for record in records:
+            parts = []
+            if show_index:
+                parts.append(f"#{record['index']}")
+            if show_time:
+                minutes = _parse_minutes(record['时间'])
+                if minutes is None:
+                    parts.append(record['时间'])
+                elif last_minutes is None or minutes < last_minutes:
+                    parts.append(record['时间'].split()[-1])
+                else:
+                    parts.append(_format_delta(minutes - last_minutes))
+                last_minutes = minutes
+            if show_sender:
+                # 连续同一发送者的消息以〃代替
+                parts.append("〃" if record['发送者'] == last_sender else record['发送者'])
+                last_sender = record['发送者']
+            line = " ".join(parts)
+            if show_message:
+                # 消息中的换行以⏎代替，保证每条消息只占一行
+                message = record['消息'].replace('\r\n', '\n').replace('\r', '\n').replace('\n', ' ⏎ ')
+                line = f"{line}: {message}" if line else message
+            lines.append(line)
+        return "\n".join(lines) + "\n"
+
+    labels = {"index": "序号", "发送者": "发送者", "时间": "时间", "消息": "消息"}
+    separator = "-" * 30
+    for record in records:
+        for field in fields:
+            lines.append(f"{labels[field]}: {record[field]}")
+        lines.append(separator)
+    return "\n".join(lines) + "\n"
+
 
 class WeChatServer:
     """
@@ -25,6 +169,46 @@ class WeChatServer:
         """
         self.wechat_client = WeChatClient(default_folder_path=default_folder_path)
 
+    def get_chat_history(self, arguments: Dict[str, Any]) -> str:
+        """
+        获取聊天记录并按输出参数格式化，参数在获取聊天记录前校验
+
+        参数:
+        - arguments: wechat_get_chat_history 工具的参数
+        返回:
+        - 格式化后的聊天记录文本
+        """
+        friend = arguments.get("to_user")
+        target_date = arguments.get("target_date")
+        if not friend or not target_date:
+            raise ValueError("缺少必要参数: to_user 或 target_date")
+
+        output_mode, fields, max_messages = _parse_history_options(
+            output_mode=arguments.get("output_mode"),
+            fields=arguments.get("fields"),
+            max_messages=arguments.get("max_messages")
+        )
+
+        folder_path = arguments.get("folder_path")
+        search_pages = arguments.get("search_pages", 5)
+        scroll_delay = arguments.get("scroll_delay", 0.01)
+        records = self.wechat_client.get_chat_records_by_date(
+            friend=friend,
+            target_date=target_date,
+            folder_path=folder_path,
+            search_pages=search_pages,
+            scroll_delay=scroll_delay
+        )
+        return format_chat_history(
+            records,
+            friend=friend,
+            target_date=target_date,
+            output_mode=output_mode,
+            fields=fields,
+            max_messages=max_messages,
+            sender=arguments.get("sender")
+        )
+
     async def serve(self):
         """启动微信服务器"""
         server = Server("WeChatServer")
@@ -72,6 +256,25 @@ class WeChatServer:
                                 "type": "string",
                                 "description": "目标日期，格式为YY/M/D，如25/3/22",
                             },
+                            "output_mode": {
+                                "type": "string",
+                                "enum": list(OUTPUT_MODES),
+                                "description": "输出模式: text(默认，逐条标注)、compact(每条一行，合并连续发送者，使用相对时间，消息中的换行显示为⏎)、jsonl(首行为{\"total\", \"matched\", \"friend\", \"date\"}统计对象，其后每条一个JSON对象)",
+                            },
+                            "fields": {
+                                "type": "array",
+                                "items": {"type": "string", "enum": list(RECORD_FIELDS) + list(FIELD_ALIASES)},
+                                "description": "只输出指定字段，如[\"发送者\", \"消息\"]，默认输出发送者、时间、消息",
+                            },
+                            "max_messages": {
+                                "type": "integer",
+                                "minimum": 0,
+                                "description": "最多返回的消息条数，保留最近的消息",
+                            },
+                            "sender": {
+                                "type": "string",
+                                "description": "只返回该发送者的消息",
+                            },
                         },
                         "required": ["to_user", "target_date"],
                     }
@@ -140,30 +343,7 @@ class WeChatServer:
         ) -> Sequence[TextContent | ImageContent | EmbeddedResource]:
             try:
                 if name == "wechat_get_chat_history":
-                    friend = arguments.get("to_user")
-                    target_date = arguments.get("target_date")
-                    if not friend or not target_date:
-                        raise ValueError("缺少必要参数: to_user 或 target_date")
-
-                    folder_path = arguments.get("folder_path")
-                    search_pages = arguments.get("search_pages", 5)
-                    scroll_delay = arguments.get("scroll_delay", 0.01)
-                    chat_history = self.wechat_client.get_chat_history_by_date(
-                        friend=friend,
-                        target_date=target_date,
-                        folder_path=folder_path,
-                        search_pages=search_pages,
-                        scroll_delay=scroll_delay
-                    )
-                    records = json.loads(chat_history)
-                    output = f"获取到 {len(records)} 条与 {friend} 在 {target_date} 的聊天记录\n\n"
-
-                    for record in records:
-                        output += f"发送者: {record['发送者']}\n"
-                        output += f"时间: {record['时间']}\n"
-                        output += f"消息: {record['消息']}\n"
-                        output += "-" * 30 + "\n"
-
+                    output = self.get_chat_history(arguments)
                     return [TextContent(type="text", text=output)]
 
                 elif name == "wechat_send_message":
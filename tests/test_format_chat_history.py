@@ -0,0 +1,172 @@
+import json
+
+import pytest
+
+from mcp_server_wechat.WechatServer import WeChatServer, format_chat_history, _parse_fields, _parse_minutes
+
+RECORDS = [
+    {"index": 0, "发送者": "张三", "时间": "25/3/22 10:30", "消息": "早"},
+    {"index": 1, "发送者": "张三", "时间": "25/3/22 10:32", "消息": "在吗"},
+    {"index": 2, "发送者": "李四", "时间": "25/3/22 11:45", "消息": "在"},
+]
+
+
+def legacy_output(records, friend, target_date):
+    """修改前call_tool中的输出格式"""
+    output = f"获取到 {len(records)} 条与 {friend} 在 {target_date} 的聊天记录\n\n"
+    for record in records:
+        output += f"发送者: {record['发送者']}\n"
+        output += f"时间: {record['时间']}\n"
+        output += f"消息: {record['消息']}\n"
+        output += "-" * 30 + "\n"
+    return output
+
+
+@pytest.mark.parametrize("records", [RECORDS, []])
+def test_default_text_matches_legacy_output(records):
+    assert format_chat_history(records, "群", "25/3/22") == legacy_output(records, "群", "25/3/22")
+
+
+def test_text_fields_projection():
+    output = format_chat_history(RECORDS[:1], "群", "25/3/22", fields=["message", "index"])
+    assert output == (
+        "获取到 1 条与 群 在 25/3/22 的聊天记录\n"
+        "\n"
+        "序号: 0\n"
+        "消息: 早\n"
+        + "-" * 30 + "\n"
+    )
+
+
+def test_compact_output():
+    assert format_chat_history(RECORDS, "群", "25/3/22", output_mode="compact") == (
+        "获取到 3 条与 群 在 25/3/22 的聊天记录\n"
+        "\n"
+        "10:30 张三: 早\n"
+        "+2m 〃: 在吗\n"
+        "+1h13m 李四: 在\n"
+    )
+
+
+def test_compact_resets_to_absolute_time():
+    records = [
+        {"index": 0, "发送者": "张三", "时间": "25/3/22 10:30", "消息": "a"},
+        {"index": 1, "发送者": "李四", "时间": "25/3/22 09:00", "消息": "b"},
+        {"index": 2, "发送者": "张三", "时间": "未知", "消息": "c"},
+        {"index": 3, "发送者": "张三", "时间": "25/3/22 12:00", "消息": "d"},
+    ]
+    assert format_chat_history(records, "群", "25/3/22", output_mode="compact") == (
+        "获取到 4 条与 群 在 25/3/22 的聊天记录\n"
+        "\n"
+        "10:30 张三: a\n"
+        "09:00 李四: b\n"
+        "未知 张三: c\n"
+        "12:00 〃: d\n"
+    )
+
+
+def test_compact_escapes_line_breaks():
+    records = [{"index": 0, "发送者": "张三", "时间": "25/3/22 10:30", "消息": "line1\r\nline2\nline3"}]
+    output = format_chat_history(records, "群", "25/3/22", output_mode="compact")
+    assert output.splitlines()[2:] == ["10:30 张三: line1 ⏎ line2 ⏎ line3"]
+
+
+def test_compact_fields_projection():
+    output = format_chat_history(RECORDS, "群", "25/3/22", output_mode="compact", fields=["消息"])
+    assert output.splitlines()[2:] == ["早", "在吗", "在"]
+
+
+def test_jsonl_output():
+    output = format_chat_history(RECORDS, "群", "25/3/22", output_mode="jsonl",
+                                 fields=["sender", "message"], max_messages=2)
+    assert output == (
+        '{"total": 3, "matched": 2, "friend": "群", "date": "25/3/22"}\n'
+        '{"发送者": "张三", "消息": "在吗"}\n'
+        '{"发送者": "李四", "消息": "在"}\n'
+    )
+    assert [json.loads(line) for line in output.splitlines()][1:] == [
+        {"发送者": "张三", "消息": "在吗"},
+        {"发送者": "李四", "消息": "在"},
+    ]
+
+
+def test_jsonl_empty_result_reports_counts():
+    output = format_chat_history(RECORDS, "群", "25/3/22", output_mode="jsonl", sender="Z")
+    assert output == '{"total": 3, "matched": 0, "friend": "群", "date": "25/3/22"}\n'
+
+
+def test_sender_and_max_messages_filters():
+    output = format_chat_history(RECORDS, "群", "25/3/22", output_mode="compact",
+                                 sender="张三", max_messages=1)
+    assert output == (
+        "获取到 3 条与 群 在 25/3/22 的聊天记录，筛选后 1 条\n"
+        "\n"
+        "10:32 张三: 在吗\n"
+    )
+
+
+def test_max_messages_zero():
+    output = format_chat_history(RECORDS, "群", "25/3/22", max_messages=0)
+    assert output == "获取到 3 条与 群 在 25/3/22 的聊天记录，筛选后 0 条\n\n"
+
+
+@pytest.mark.parametrize("max_messages", [-1, True, 2.9, "abc"])
+def test_max_messages_invalid(max_messages):
+    with pytest.raises(ValueError):
+        format_chat_history(RECORDS, "群", "25/3/22", max_messages=max_messages)
+
+
+def test_unknown_output_mode():
+    with pytest.raises(ValueError):
+        format_chat_history(RECORDS, "群", "25/3/22", output_mode="xml")
+
+
+def test_parse_fields():
+    assert _parse_fields(None) == ["发送者", "时间", "消息"]
+    assert _parse_fields([]) == ["发送者", "时间", "消息"]
+    assert _parse_fields(["message", "sender", "index"]) == ["index", "发送者", "消息"]
+    assert _parse_fields("time, 发送者") == ["发送者", "时间"]
+    with pytest.raises(ValueError):
+        _parse_fields(["unknown"])
+
+
+def test_parse_minutes():
+    assert _parse_minutes("25/3/22 10:30") == 630
+    assert _parse_minutes("昨天 9:05") == 545
+    assert _parse_minutes("星期一") is None
+
+
+class StubWeChatClient:
+    def __init__(self):
+        self.calls = 0
+
+    def get_chat_records_by_date(self, **kwargs):
+        self.calls += 1
+        return RECORDS
+
+
+@pytest.mark.parametrize("options", [
+    {"output_mode": "json"},
+    {"fields": ["name"]},
+    {"max_messages": "abc"},
+    {"max_messages": True},
+])
+def test_get_chat_history_validates_before_scrape(options):
+    server = WeChatServer()
+    server.wechat_client = StubWeChatClient()
+    with pytest.raises(ValueError):
+        server.get_chat_history({"to_user": "群", "target_date": "25/3/22", **options})
+    assert server.wechat_client.calls == 0
+
+
+def test_get_chat_history():
+    server = WeChatServer()
+    server.wechat_client = StubWeChatClient()
+    output = server.get_chat_history({"to_user": "群", "target_date": "25/3/22", "output_mode": "compact",
+                                      "max_messages": 1})
+    assert output == (
+        "获取到 3 条与 群 在 25/3/22 的聊天记录，筛选后 1 条\n"
+        "\n"
+        "11:45 李四: 在\n"
+    )
+    assert server.wechat_client.calls == 1